@@ -7,13 +7,21 @@ window has focus.
 Supports both X11 (via pynput + xdotool) and Wayland (via evdev + ydotool).
 """
 
+import array
+import atexit
+import contextlib
+import functools
 import logging
+import math
 import os
+import queue
 import select
+import stat
 import subprocess
 import sys
 import tempfile
 import threading
+import traceback
 import warnings
 
 MODEL_NAME = "nvidia/parakeet-tdt-0.6b-v3"
@@ -37,30 +45,38 @@ def _is_wayland():
 SESSION_IS_WAYLAND = _is_wayland()
 
 
+class _NoInputDevice(Exception):
+    """sounddevice is installed but PortAudio can't open an input stream."""
+
+
 class ParakeetKbd:
     def __init__(self, model):
         self.model = model
         self.recording = False
         self._rec_proc = None
         self._audio_path = None
+        self._stop_event = threading.Event()
         self._lock = threading.Lock()
 
     def toggle(self):
+        # Only the state flip needs the lock; stopping may wait up to two
+        # seconds for SoX to exit and shouldn't be done while holding it.
         with self._lock:
-            if not self.recording:
-                self._start_recording()
-            else:
-                self._stop_recording()
+            start = not self.recording
+            if start:
+                self.recording = True
+                self._stop_event.clear()
+
+        if start:
+            self._start_recording()
+        else:
+            self._stop_recording()
 
     def _start_recording(self):
-        self.recording = True
-        fd, self._audio_path = tempfile.mkstemp(
-            suffix=".wav", prefix="parakeet_kbd_"
-        )
-        os.close(fd)
         threading.Thread(target=self._record_flow, daemon=True).start()
 
     def _stop_recording(self):
+        self._stop_event.set()
         if self._rec_proc and self._rec_proc.poll() is None:
             self._rec_proc.terminate()
             try:
@@ -70,31 +86,16 @@ class ParakeetKbd:
 
     def _record_flow(self):
         try:
+            # Played inline so the beep is over before the mic opens.
             _play_beep(BEEP_START_FREQ)
             _notify("Recording... (F9 to stop)")
 
-            self._rec_proc = subprocess.Popen([
-                "rec", "-q",
-                "-r", str(SAMPLE_RATE), "-c", "1", "-b", "16",
-                self._audio_path,
-                "silence", "1", "0.1", SILENCE_THRESHOLD,
-                "1", SILENCE_DURATION, SILENCE_THRESHOLD,
-            ])
-            self._rec_proc.wait()
-
-            _play_beep(BEEP_STOP_FREQ)
-
-            if not os.path.isfile(self._audio_path):
-                _notify("Recording failed")
-                return
-
-            if os.path.getsize(self._audio_path) < 1000:
-                _notify("No speech detected")
+            audio = self._record()
+            if audio is None:
                 return
 
             _notify("Transcribing...")
-            output = self.model.transcribe([self._audio_path])
-            text = output[0].text.strip() if output else ""
+            text = _transcribe(self.model, audio)
 
             if text:
                 _type_text(text)
@@ -106,12 +107,127 @@ class ParakeetKbd:
 
         finally:
             self.recording = False
-            if self._audio_path and os.path.exists(self._audio_path):
+            # Don't leave the last utterance on disk between recordings.
+            if self._audio_path is not None:
                 try:
-                    os.unlink(self._audio_path)
+                    os.truncate(self._audio_path, 0)
                 except OSError:
                     pass
 
+    def _record(self):
+        """Record one utterance as float32 samples or a WAV path, or None."""
+        # None means nothing usable was recorded; the user has been told why.
+        sounddevice = _sounddevice()
+        if sounddevice is not None:
+            try:
+                return self._record_sounddevice(sounddevice)
+            except _NoInputDevice:
+                pass
+        return self._record_sox()
+
+    def _record_sounddevice(self, sounddevice):
+        """Capture from the default input until F9 or trailing silence."""
+        # Mirrors the SoX "silence" effect used by _record_sox: nothing is
+        # kept until a 0.1 s block is louder than the threshold, and capture
+        # stops once SILENCE_DURATION of quiet blocks follow. Returns None if
+        # nobody spoke, and raises _NoInputDevice if PortAudio can't record.
+        import numpy as np
+
+        block_size = SAMPLE_RATE // 10
+        # Sum of |sample| over a block at the SoX-style percentage threshold.
+        threshold = 32768 * float(SILENCE_THRESHOLD.rstrip("%")) / 100
+        threshold *= block_size
+        max_silent_blocks = round(float(SILENCE_DURATION) * 10)
+        pcm = bytearray()
+        silent_blocks = 0
+
+        def callback(indata, frames, time, status):
+            nonlocal silent_blocks
+            samples = np.frombuffer(indata, dtype=np.int16)
+            loud = np.abs(samples, dtype=np.int32).sum() >= threshold
+            if not pcm and not loud:
+                return
+            pcm.extend(indata)
+            silent_blocks = 0 if loud else silent_blocks + 1
+            if silent_blocks >= max_silent_blocks:
+                raise sounddevice.CallbackStop
+
+        try:
+            stream = sounddevice.RawInputStream(
+                samplerate=SAMPLE_RATE, channels=1, dtype="int16",
+                blocksize=block_size, callback=callback,
+                finished_callback=self._stop_event.set,
+            )
+        except sounddevice.PortAudioError as exc:
+            raise _NoInputDevice from exc
+
+        try:
+            stream.start()
+        except sounddevice.PortAudioError as exc:
+            stream.close()
+            raise _NoInputDevice from exc
+
+        try:
+            self._stop_event.wait()
+        finally:
+            stream.stop()
+            stream.close()
+
+        _ui_submit(_play_beep, BEEP_STOP_FREQ)
+
+        if silent_blocks:
+            del pcm[-silent_blocks * block_size * 2:]
+        if not pcm:
+            _notify("No speech detected")
+            return None
+        return np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768
+
+    def _record_sox(self):
+        """Record into a temporary WAV via SoX's ``rec`` and return its path."""
+        # Only one recording runs at a time, so one file is reused: created
+        # on first use (or if something deleted it), emptied after each
+        # transcription and removed at exit.
+        if self._audio_path is not None:
+            try:
+                os.truncate(self._audio_path, 0)
+            except FileNotFoundError:
+                atexit.unregister(_unlink_quietly)
+                self._audio_path = None
+
+        if self._audio_path is None:
+            fd, self._audio_path = tempfile.mkstemp(
+                suffix=".wav", prefix="parakeet_kbd_",
+                dir=os.environ.get("XDG_RUNTIME_DIR"),
+            )
+            os.close(fd)
+            atexit.register(_unlink_quietly, self._audio_path)
+
+        self._rec_proc = subprocess.Popen([
+            "rec", "-q",
+            "-r", str(SAMPLE_RATE), "-c", "1", "-b", "16",
+            self._audio_path,
+            "silence", "1", "0.1", SILENCE_THRESHOLD,
+            "1", SILENCE_DURATION, SILENCE_THRESHOLD,
+        ])
+        self._rec_proc.wait()
+
+        _ui_submit(_play_beep, BEEP_STOP_FREQ)
+
+        try:
+            st = os.stat(self._audio_path)
+        except FileNotFoundError:
+            st = None
+
+        if st is None or not stat.S_ISREG(st.st_mode):
+            _notify("Recording failed")
+            return None
+
+        if st.st_size < 1000:
+            _notify("No speech detected")
+            return None
+
+        return self._audio_path
+
 
 # --- Key listening ---------------------------------------------------------
 
@@ -131,11 +247,16 @@ def _listen_evdev(daemon):
     """Listen for F9 via evdev (Wayland / kernel-level)."""
     import evdev
 
-    devices = [evdev.InputDevice(path) for path in evdev.list_devices()]
-    keyboards = {
-        d.fd: d for d in devices
-        if evdev.ecodes.EV_KEY in d.capabilities()
-    }
+    # Only watch devices that can emit F9: mice also report EV_KEY (for
+    # their buttons) and would otherwise wake us on every motion event.
+    keyboards = {}
+    for path in evdev.list_devices():
+        dev = evdev.InputDevice(path)
+        keys = dev.capabilities().get(evdev.ecodes.EV_KEY, [])
+        if evdev.ecodes.KEY_F9 in keys:
+            keyboards[dev.fd] = dev
+        else:
+            dev.close()
 
     if not keyboards:
         print("parakeet-kbd: ERROR — no keyboard devices found.", file=sys.stderr)
@@ -144,10 +265,13 @@ def _listen_evdev(daemon):
         print("  Then log out and back in.", file=sys.stderr)
         sys.exit(1)
 
+    poller = select.epoll()
+    for fd in keyboards:
+        poller.register(fd, select.EPOLLIN)
+
     while True:
-        r, _, _ = select.select(keyboards.values(), [], [])
-        for dev in r:
-            for event in dev.read():
+        for fd, _ in poller.poll():
+            for event in keyboards[fd].read():
                 if (event.type == evdev.ecodes.EV_KEY
                         and event.value == 1
                         and event.code == evdev.ecodes.KEY_F9):
@@ -165,14 +289,101 @@ def _type_text(text):
         )
     else:
         subprocess.run(
-            ["xdotool", "type", "--clearmodifiers", "--delay", "0", "--", text],
+            ["xdotool", "type", "--clearmodifiers", "--delay", "0",
+             "--file", "-"],
+            input=text.encode("utf-8"),
             timeout=10,
         )
 
 
+# --- UI side effects -------------------------------------------------------
+
+UI_QUEUE_LIMIT = 8
+
+_ui_queue = queue.SimpleQueue()
+_ui_thread = None
+_ui_thread_lock = threading.Lock()
+
+_pending_notification = None
+_notification_lock = threading.Lock()
+
+
+def _ui_submit(fn, *args):
+    """Run fn(*args) on the UI worker thread; False if it was dropped."""
+    # Keeps callers from waiting on a beep or a notify-send fork; work is
+    # dropped rather than queued once the worker falls far behind.
+    global _ui_thread
+    if _ui_queue.qsize() > UI_QUEUE_LIMIT:
+        return False
+    with _ui_thread_lock:
+        if _ui_thread is None:
+            _ui_thread = threading.Thread(target=_ui_worker, daemon=True)
+            _ui_thread.start()
+    _ui_queue.put((fn, args))
+    return True
+
+
+def _ui_worker():
+    while True:
+        fn, args = _ui_queue.get()
+        try:
+            fn(*args)
+        except Exception:
+            traceback.print_exc()
+
+
 # --- Utilities -------------------------------------------------------------
 
+@functools.cache
+def _sounddevice():
+    """Return the optional sounddevice module, or None if unavailable."""
+    # Cached: importing it initialises PortAudio, and a failed import
+    # shouldn't be retried on every beep.
+    try:
+        import sounddevice
+    except (ImportError, OSError):
+        return None
+    return sounddevice
+
+
+def _unlink_quietly(path):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _render_beep(frequency):
+    """Render a sine beep as signed 16-bit mono PCM."""
+    n_samples = int(SAMPLE_RATE * float(BEEP_DURATION))
+    amplitude = 32767 * float(BEEP_VOLUME)
+    step = 2 * math.pi * frequency / SAMPLE_RATE
+    return array.array(
+        "h", (int(amplitude * math.sin(step * i)) for i in range(n_samples))
+    ).tobytes()
+
+
+_BEEPS = {freq: _render_beep(freq) for freq in (BEEP_START_FREQ, BEEP_STOP_FREQ)}
+
+
 def _play_beep(frequency):
+    """Play a short beep, in-process via sounddevice when available."""
+    sounddevice = _sounddevice()
+    if sounddevice is None:
+        _play_beep_sox(frequency)
+        return
+
+    try:
+        with sounddevice.RawOutputStream(
+            samplerate=SAMPLE_RATE, channels=1, dtype="int16",
+        ) as stream:
+            stream.write(_BEEPS[frequency])
+    except sounddevice.PortAudioError:
+        # No output device, or one that rejects 16 kHz mono; SoX resamples.
+        _play_beep_sox(frequency)
+
+
+def _play_beep_sox(frequency):
     """Play a short beep via SoX."""
     try:
         subprocess.run(
@@ -189,6 +400,24 @@ def _play_beep(frequency):
 
 
 def _notify(message):
+    """Show a desktop notification without blocking the caller."""
+    # A message posted while an earlier one is still waiting for the worker
+    # replaces it: each notification supersedes the last on screen anyway.
+    global _pending_notification
+    with _notification_lock:
+        if _pending_notification is None and not _ui_submit(_flush_notification):
+            return
+        _pending_notification = message
+
+
+def _flush_notification():
+    global _pending_notification
+    with _notification_lock:
+        message, _pending_notification = _pending_notification, None
+    _notify_sync(message)
+
+
+def _notify_sync(message):
     """Show a desktop notification."""
     try:
         subprocess.run(
@@ -202,20 +431,55 @@ def _notify(message):
         pass
 
 
-def main():
-    print(f"Loading {MODEL_NAME}...")
+@contextlib.contextmanager
+def _quiet_model_loading():
+    """Silence warnings and log chatter while the model loads."""
+    # Disabled globally rather than per logger because importing NeMo and
+    # Lightning resets their own loggers to INFO.
+    previous_disable = logging.root.manager.disable
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        logging.disable(logging.WARNING)
+        try:
+            yield
+        finally:
+            logging.disable(previous_disable)
+
 
-    warnings.filterwarnings("ignore")
-    logging.disable(logging.WARNING)
+def _transcribe(model, audio):
+    """Transcribe one utterance (WAV path or float32 samples) to text."""
+    import torch
 
-    import nemo.collections.asr as nemo_asr
-    model = nemo_asr.models.ASRModel.from_pretrained(model_name=MODEL_NAME)
+    with torch.inference_mode():
+        output = model.transcribe([audio])
+    return output[0].text.strip() if output else ""
 
-    logging.disable(logging.NOTSET)
-    warnings.resetwarnings()
+
+def _warm_up(model):
+    """Transcribe one second of silence to warm up the model."""
+    # So the first real utterance doesn't pay for CUDA context setup and
+    # kernel selection.
+    import numpy as np
+
+    _transcribe(model, np.zeros(SAMPLE_RATE, dtype=np.float32))
+
+
+def main():
+    print(f"Loading {MODEL_NAME}...")
+
+    with _quiet_model_loading():
+        import nemo.collections.asr as nemo_asr
+        import torch
+        torch.set_float32_matmul_precision("high")
+        model = nemo_asr.models.ASRModel.from_pretrained(model_name=MODEL_NAME)
+        model.eval()
+        _warm_up(model)
 
     print("Model loaded.")
 
+    # Initialise PortAudio now rather than inside the first F9's beep.
+    _sounddevice()
+
     session = "Wayland" if SESSION_IS_WAYLAND else "X11"
     print(f"parakeet-kbd: {session} session detected.")
     print("parakeet-kbd: listening. Press F9 to toggle voice recording.")